@@ -1,13 +1,73 @@
-import pulp as plp
-from math import sqrt
+import os
+import re
+import subprocess
+import tempfile
+from math import isqrt
+
+import numpy as np
+
+try:
+    import pulp as plp
+except ImportError:  # PuLP is only needed for the linear programming fallback
+    plp = None
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:  # Without Numba the pure Python backtracker is used instead
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+# Cached PuLP models without clues, keyed by (size, diagonal)
+_model_cache = {}
+
+# PuLP solver backend, picked on first use by get_lp_solver()
+_lp_solver = None
+
+# LP files of the cached models for the CBC binary, keyed like _model_cache and split
+# where a puzzle's clue bounds are inserted
+_lp_text_cache = {}
+
+# Largest supported puzzle size: the compiled solver keeps each unit's values in masks of at most
+# 32 bits, and 25 is the largest perfect square below that
+MAX_SIZE = 25
+
+# Results of the compiled solver other than the flat index of a conflicting clue (see _solve_cells_nb)
+SOLVED = -1
+NO_SOLUTION = -2
+
+# Lookup table from cell tokens to numbers, which falls back to int() for other tokens made of
+# digits only, such as '07'
+class _NumLookup(dict):
+    def __missing__(self, key):
+        if isinstance(key, str) and key.isdecimal() and int(key) < 36:
+            return int(key)
+        raise KeyError(key)
+
+# Lookup table from cell tokens to numbers: digits, letters A, B, C, ... (either case) for
+# 10, 11, 12, etc. (for 16x16 puzzles), and values that are already numbers
+_NUM_LUT = _NumLookup({str(i): i for i in range(36)})
+_NUM_LUT.update({chr(55 + i): i for i in range(10, 36)})  # 'A' -> 10, 'B' -> 11, etc.
+_NUM_LUT.update({chr(87 + i): i for i in range(10, 36)})  # 'a' -> 10, 'b' -> 11, etc.
+_NUM_LUT.update({i: i for i in range(36)})
+
+# Printable form of each number (numbers > 9 become letters)
+_DISPLAY = tuple(chr(55 + i) if i > 9 else i for i in range(36))
+
+# Blank lines (possibly holding stray whitespace) that separate the puzzles of an input file
+_BLOCK_SEPARATOR = re.compile(r'\n\s*\n')
 
 # Converts letters A, B, C, ... to numbers 10, 11, 12, etc. (for 16x16 puzzles)
 def convert_to_numeric(value):
-    if isinstance(value, str) and value.isalpha():
-        return ord(value.upper()) - 55  # Convert 'A' -> 10, 'B' -> 11, etc.
-    return int(value)  # If it's already a number or 0, return as is
+    try:
+        return _NUM_LUT[value]
+    except KeyError:
+        raise ValueError(f"Invalid value '{value}'. Use 0 for empty cells, digits, or letters for values above 9.") from None
 
-# Checks the validity of the Sudoku problem
+# Checks the validity of the Sudoku problem and returns it as a numeric array
 def validate_sudoku_input(input_sudoku):
     n_rows = len(input_sudoku)
     n_cols = len(input_sudoku[0])
@@ -23,20 +83,30 @@ def validate_sudoku_input(input_sudoku):
         raise ValueError(f"Sudoku grid is not square. Found {n_rows} rows and {n_cols} columns.")
 
     # Check if the number of rows/columns (n) is a perfect square (i.e., n = m^2)
-    m = int(sqrt(n_rows))
+    m = isqrt(n_rows)
     if m * m != n_rows:
         raise ValueError(f"Sudoku dimension {n_rows}x{n_cols} is invalid. "
                          f"The number of rows/columns must be a perfect square (e.g., 4x4, 9x9, 16x16).")
+    if n_rows > MAX_SIZE:
+        raise ValueError(f"Sudoku dimension {n_rows}x{n_cols} is too large. "
+                         f"The largest supported size is {MAX_SIZE}x{MAX_SIZE}.")
 
     # Check if all values are valid (between 1 and n or 0 for empty cells)
-    for row in range(n_rows):
-        for col in range(n_cols):
-            value = input_sudoku[row][col]
-            numeric_value = convert_to_numeric(value)
-            if not (0 <= numeric_value <= n_rows):
-                raise ValueError(f"Invalid value '{value}' at position ({row + 1}, {col + 1}). "
-                                 f"Values must be between 1 and {n_rows}, or 0 for empty cells.")
-    return n_rows, n_cols, m
+    if isinstance(input_sudoku, np.ndarray) and input_sudoku.dtype.kind in 'iu':
+        board = input_sudoku  # Already numeric, e.g. as returned by read_sudokus_from_file
+    else:
+        try:
+            board = np.array([list(map(_NUM_LUT.__getitem__, row)) for row in input_sudoku], dtype=np.int8)
+        except KeyError as e:
+            raise ValueError(f"Invalid value '{e.args[0]}'. "
+                             f"Values must be between 1 and {n_rows}, or 0 for empty cells.") from None
+    invalid = (board < 0) | (board > n_rows)
+    if invalid.any():
+        row, col = np.argwhere(invalid)[0]
+        raise ValueError(f"Invalid value '{input_sudoku[row][col]}' at position ({row + 1}, {col + 1}). "
+                         f"Values must be between 1 and {n_rows}, or 0 for empty cells.")
+    # Always return a copy, since the solvers fill the board in place
+    return board.astype(np.int8), n_rows, n_cols, m
 
 # Sets up the Sudoku problem using PuLP
 def setup_problem(n_rows, n_cols):
@@ -54,51 +124,86 @@ def setup_problem(n_rows, n_cols):
     return prob, rows, cols, values, grid_vars
 
 # Adds the basic Sudoku constraints to the problem
-def create_sudoku_constraints(prob, grid_vars, rows, cols, values, n, m, input_sudoku):
+# The constraints below sum, per family, to n^2, so one constraint out of each group summing to a
+# row constraint is implied by the others and skipped: the last column for each value, the
+# last sub-grid for each value and the last cell of each row
+def create_sudoku_constraints(prob, grid_vars, rows, cols, values, n, m):
+    # All variables in one flat list, grid_vars[row][col][value] being flat[(row*n + col)*n + value - 1],
+    # so that each unit's variables are a slice or a single integer index away
+    flat = []
+    for row in rows:
+        row_vars = grid_vars[row]
+        for col in cols:
+            cell_vars = row_vars[col]
+            flat.extend(cell_vars[value] for value in values)
+    nn = n * n
+
     # Each column contains exactly one integer number 1 to n:
-    for col in cols:
+    for col in cols[:-1]:
         for value in values:
-            prob.addConstraint(plp.lpSum([grid_vars[row][col][value] for row in rows]) == 1,
+            prob.addConstraint(plp.LpAffineExpression((var, 1) for var in flat[col*n + value - 1::nn]) == 1,
                                name=f"col_{col}_value_{value}")
 
     # Each row contains exactly one integer number 1 to n:
     for row in rows:
         for value in values:
-            prob.addConstraint(plp.lpSum([grid_vars[row][col][value] for col in cols]) == 1,
+            start = row*nn + value - 1
+            prob.addConstraint(plp.LpAffineExpression((var, 1) for var in flat[start:start + nn:n]) == 1,
                                name=f"row_{row}_value_{value}")
 
     # Each cell contains exactly one integer number 1 to n:
     for row in rows:
-        for col in cols:
-            prob.addConstraint(plp.lpSum([grid_vars[row][col][value] for value in values]) == 1,
+        for col in cols[:-1]:
+            start = (row*n + col)*n
+            prob.addConstraint(plp.LpAffineExpression((var, 1) for var in flat[start:start + n]) == 1,
                                name=f"cell_{row}_{col}")
 
     # Each sub-grid contains exactly one integer number 1 to n:
     for grid_row in range(m):
         for grid_col in range(m):
+            if grid_row == grid_col == m - 1:
+                continue
+            # Offsets of the sub-grid's cells in flat, for value 1
+            offsets = [((grid_row*m + row)*n + grid_col*m + col)*n for row in range(m) for col in range(m)]
             for value in values:
-                prob.addConstraint(plp.lpSum([grid_vars[grid_row*m+row][grid_col*m+col][value]
-                                              for row in range(m)
-                                              for col in range(m)]) == 1,
+                prob.addConstraint(plp.LpAffineExpression((flat[offset + value - 1], 1) for offset in offsets) == 1,
                                    name=f"subgrid_{grid_row}_{grid_col}_value_{value}")
 
-    # Prefill known values (clues)
+# Yields the variables that the known values (clues) of a puzzle fix, each with its fixed value:
+# 1 for the clue's variable and 0 for the cell's other values
+def prefilled_values(grid_vars, rows, cols, values, input_sudoku):
     for row in rows:
         for col in cols:
             if input_sudoku[row][col] != 0:
-                value = convert_to_numeric(input_sudoku[row][col])
-                prob.addConstraint(grid_vars[row][col][value] == 1,
-                                   name=f"prefilled_{row}_{col}")
+                clue = convert_to_numeric(input_sudoku[row][col])
+                cell_vars = grid_vars[row][col]
+                for value in values:
+                    yield cell_vars[value], int(value == clue)
+
+# Fixes the known values (clues) of a puzzle through variable bounds instead of constraint rows
+# Returns the fixed variables, whose bounds must be released again with release_prefilled_values()
+def fix_prefilled_values(grid_vars, rows, cols, values, input_sudoku):
+    fixed = []
+    for var, fixed_value in prefilled_values(grid_vars, rows, cols, values, input_sudoku):
+        var.lowBound = var.upBound = fixed_value
+        fixed.append(var)
+    return fixed
+
+# Restores the binary bounds of variables fixed by fix_prefilled_values()
+def release_prefilled_values(fixed):
+    for var in fixed:
+        var.lowBound = 0
+        var.upBound = 1
 
 # Adds diagonal Sudoku constraints if needed (for Sudoku X)
 def add_diagonal_sudoku_constraints(prob, grid_vars, rows, cols, values):
     # Top-left to bottom-right diagonal
     for value in values:
-        prob.addConstraint(plp.lpSum([grid_vars[i][i][value] for i in rows]) == 1,
+        prob.addConstraint(plp.LpAffineExpression((grid_vars[i][i][value], 1) for i in rows) == 1,
                            name=f"diagonal1_value_{value}")
     # Top-right to bottom-left diagonal
     for value in values:
-        prob.addConstraint(plp.lpSum([grid_vars[i][len(rows)-i-1][value] for i in rows]) == 1,
+        prob.addConstraint(plp.LpAffineExpression((grid_vars[i][len(rows)-i-1][value], 1) for i in rows) == 1,
                            name=f"diagonal2_value_{value}")
 
 # Extracts the solution from the PuLP variables
@@ -106,37 +211,610 @@ def extract_solution(grid_vars, rows, cols, values):
     solution = [[0 for _ in cols] for _ in rows]
     for row in rows:
         for col in cols:
+            cell_vars = grid_vars[row][col]
             for value in values:
-                if plp.value(grid_vars[row][col][value]):
-                    # Convert numbers > 9 to letters
-                    solution[row][col] = chr(55 + value) if value > 9 else value  
+                var_value = cell_vars[value].varValue
+                if var_value and var_value > 0.5:
+                    solution[row][col] = _DISPLAY[value]
+                    break
     return solution
 
-# Solver for Sudoku, including optional diagonal constraint
-def solver(input_sudoku, diagonal=False):
-    try:
-        # Validate the input Sudoku
-        n_rows, n_cols, m = validate_sudoku_input(input_sudoku)
-
+# Returns the error reported for a clue that conflicts with an earlier clue
+def clue_conflict_error(value, row, col):
+    return ValueError(f"Clue '{value}' at position ({row + 1}, {col + 1}) conflicts with another clue.")
+
+# Builds the bitmasks of used values for every row, column, sub-grid and diagonal
+# (bit v-1 is set when value v is already placed in that unit)
+def build_masks(board, n, m, diagonal=False):
+    row_mask = [0] * n
+    col_mask = [0] * n
+    box_mask = [0] * n
+    diag_mask = [0, 0]
+    for row in range(n):
+        for col in range(n):
+            value = board[row][col]
+            if value == 0:
+                continue
+            bit = 1 << (value - 1)
+            box = (row // m) * m + col // m
+            used = row_mask[row] | col_mask[col] | box_mask[box]
+            if diagonal:
+                if row == col:
+                    used |= diag_mask[0]
+                if row + col == n - 1:
+                    used |= diag_mask[1]
+            if used & bit:
+                raise clue_conflict_error(value, row, col)
+            row_mask[row] |= bit
+            col_mask[col] |= bit
+            box_mask[box] |= bit
+            if diagonal:
+                if row == col:
+                    diag_mask[0] |= bit
+                if row + col == n - 1:
+                    diag_mask[1] |= bit
+    return row_mask, col_mask, box_mask, diag_mask
+
+# Fills every empty cell that has a single candidate left (naked single), sweeping the board
+# until no such cell remains. Returns False if some empty cell has no candidate at all
+def propagate(board, row_mask, col_mask, box_mask, diag_mask, n, m, diagonal=False):
+    full = (1 << n) - 1
+    changed = True
+    while changed:
+        changed = False
+        for row in range(n):
+            for col in range(n):
+                if board[row][col] != 0:
+                    continue
+                box = (row // m) * m + col // m
+                used = row_mask[row] | col_mask[col] | box_mask[box]
+                if diagonal:
+                    if row == col:
+                        used |= diag_mask[0]
+                    if row + col == n - 1:
+                        used |= diag_mask[1]
+                cand = ~used & full
+                if cand == 0:
+                    return False
+                if cand & (cand - 1) == 0:
+                    board[row][col] = cand.bit_length()
+                    row_mask[row] |= cand
+                    col_mask[col] |= cand
+                    box_mask[box] |= cand
+                    if diagonal:
+                        if row == col:
+                            diag_mask[0] |= cand
+                        if row + col == n - 1:
+                            diag_mask[1] |= cand
+                    changed = True
+    return True
+
+# Lists the units (rows, columns, sub-grids and, for Sudoku X, diagonals) as flat cell indices,
+# each paired with the mask list and index holding the values already placed in it
+def sudoku_units(n, m, row_mask, col_mask, box_mask, diag_mask, diagonal=False):
+    units = []
+    for i in range(n):
+        box_row, box_col = (i // m) * m, (i % m) * m
+        units.append(([i * n + col for col in range(n)], row_mask, i))
+        units.append(([row * n + i for row in range(n)], col_mask, i))
+        units.append(([(box_row + row) * n + box_col + col for row in range(m) for col in range(m)], box_mask, i))
+    if diagonal:
+        units.append(([i * n + i for i in range(n)], diag_mask, 0))
+        units.append(([i * n + n - 1 - i for i in range(n)], diag_mask, 1))
+    return units
+
+# Recursive backtracking over the bitmasks, filling the board in place
+# Branches on the most constrained choice (MRV heuristic): either the empty cell with the fewest
+# candidate values, or the missing value of a unit with the fewest cells left to hold it
+def backtrack(board, row_mask, col_mask, box_mask, diag_mask, n, m, diagonal=False, units=None):
+    if units is None:
+        units = sudoku_units(n, m, row_mask, col_mask, box_mask, diag_mask, diagonal)
+    full = (1 << n) - 1
+    cands = [0] * (n * n)
+    best_cell = -1
+    best_cand = 0
+    best_count = n + 1
+    for row in range(n):
+        for col in range(n):
+            if board[row][col] != 0:
+                continue
+            used = row_mask[row] | col_mask[col] | box_mask[(row // m) * m + col // m]
+            if diagonal:
+                if row == col:
+                    used |= diag_mask[0]
+                if row + col == n - 1:
+                    used |= diag_mask[1]
+            cand = ~used & full
+            count = bin(cand).count('1')
+            # Dead end: an empty cell has no candidate left
+            if count == 0:
+                return False
+            cands[row * n + col] = cand
+            if count < best_count:
+                best_cell, best_cand, best_count = row * n + col, cand, count
+
+    # No empty cell left: the board is solved
+    if best_cell < 0:
+        return True
+
+    # Each choice is a (cell, value bit) placement to try
+    choices = []
+    if best_count > 1:
+        for cells, masks, index in units:
+            missing = ~masks[index] & full
+            while missing:
+                bit = missing & -missing
+                missing ^= bit
+                positions = [cell for cell in cells if cands[cell] & bit]
+                # Dead end: a missing value has no cell left in this unit
+                if not positions:
+                    return False
+                if len(positions) < best_count:
+                    best_count = len(positions)
+                    choices = [(cell, bit) for cell in positions]
+            if best_count == 1:
+                break
+    if not choices:
+        cand = best_cand
+        while cand:
+            bit = cand & -cand  # Lowest remaining candidate
+            cand ^= bit
+            choices.append((best_cell, bit))
+
+    for cell, bit in choices:
+        row, col = divmod(cell, n)
+        box = (row // m) * m + col // m
+        on_diag1 = diagonal and row == col
+        on_diag2 = diagonal and row + col == n - 1
+        board[row][col] = bit.bit_length()
+        row_mask[row] |= bit
+        col_mask[col] |= bit
+        box_mask[box] |= bit
+        if on_diag1:
+            diag_mask[0] |= bit
+        if on_diag2:
+            diag_mask[1] |= bit
+
+        if backtrack(board, row_mask, col_mask, box_mask, diag_mask, n, m, diagonal, units):
+            return True
+
+        board[row][col] = 0
+        row_mask[row] ^= bit
+        col_mask[col] ^= bit
+        box_mask[box] ^= bit
+        if on_diag1:
+            diag_mask[0] ^= bit
+        if on_diag2:
+            diag_mask[1] ^= bit
+
+    return False
+
+# Returns the flat index of the j-th cell of unit i of the given kind
+# (kind 0 = row, 1 = column, 2 = sub-grid, 3 = diagonal)
+@njit(cache=True)
+def _unit_cell_nb(kind, i, j, n, m):
+    if kind == 0:
+        return i * n + j
+    if kind == 1:
+        return j * n + i
+    if kind == 2:
+        return ((i // m) * m + j // m) * n + (i % m) * m + j % m
+    if i == 0:
+        return j * n + j
+    return j * n + n - 1 - j
+
+# Counts the set bits of a candidate mask (up to 32 bits) without branches, so that loops
+# calling it can be vectorized
+@njit(cache=True)
+def _popcount_nb(x):
+    x = x - ((x >> 1) & 0x55555555)
+    x = (x & 0x33333333) + ((x >> 2) & 0x33333333)
+    x = (x + (x >> 4)) & 0x0F0F0F0F
+    return ((x * 0x01010101) & 0xFFFFFFFF) >> 24
+
+# Builds the cell -> unit lookup tables used by the compiled solver: the row, column and sub-grid
+# of every flat cell index, and an all-ones selector for cells lying on each diagonal
+@njit(cache=True)
+def _cell_tables_nb(n, m):
+    n_cells = n * n
+    row_of = np.empty(n_cells, np.int32)
+    col_of = np.empty(n_cells, np.int32)
+    box_of = np.empty(n_cells, np.int32)
+    diag1_sel = np.zeros(n_cells, np.int32)
+    diag2_sel = np.zeros(n_cells, np.int32)
+    for row in range(n):
+        for col in range(n):
+            cell = row * n + col
+            row_of[cell] = row
+            col_of[cell] = col
+            box_of[cell] = (row // m) * m + col // m
+            if row == col:
+                diag1_sel[cell] = -1
+            if row + col == n - 1:
+                diag2_sel[cell] = -1
+    return row_of, col_of, box_of, diag1_sel, diag2_sel
+
+# Places value bit in a cell, or removes it again when the cell already holds it
+@njit(cache=True)
+def _toggle_nb(cells, row_mask, col_mask, box_mask, diag_mask, cell, bit, n, m, diagonal):
+    row = cell // n
+    col = cell % n
+    row_mask[row] ^= bit
+    col_mask[col] ^= bit
+    box_mask[(row // m) * m + col // m] ^= bit
+    if diagonal:
+        if row == col:
+            diag_mask[0] ^= bit
+        if row + col == n - 1:
+            diag_mask[1] ^= bit
+    if cells[cell] == 0:
+        value = 1
+        while (1 << (value - 1)) != bit:
+            value += 1
+        cells[cell] = value
+    else:
+        cells[cell] = 0
+
+# Picks the most constrained choice the same way as backtrack() and writes its placements
+# to choice_cell/choice_bit. Returns their number, 0 at a dead end or -1 when the board is solved
+@njit(cache=True)
+def _select_nb(cells, row_mask, col_mask, box_mask, diag_mask, n, m, diagonal, tables,
+               cands, counts, at_least, choice_cell, choice_bit):
+    row_of, col_of, box_of, diag1_sel, diag2_sel = tables
+    full = (1 << n) - 1
+    n_cells = n * n
+
+    # Candidates and their counts for the whole board in branch-free passes over flat arrays,
+    # which LLVM turns into SIMD code. Filled cells get no candidates and a count of n + 1;
+    # diag_mask stays empty for standard puzzles, so the diagonal terms need no flag check
+    for cell in range(n_cells):
+        used = (row_mask[row_of[cell]] | col_mask[col_of[cell]] | box_mask[box_of[cell]]
+                | (diag_mask[0] & diag1_sel[cell]) | (diag_mask[1] & diag2_sel[cell]))
+        cands[cell] = (~used & full) * (cells[cell] == 0)
+    for cell in range(n_cells):
+        counts[cell] = _popcount_nb(cands[cell]) + (cells[cell] != 0) * (n + 1)
+
+    best_cell = np.argmin(counts)
+    best_count = counts[best_cell]
+    # No empty cell left: the board is solved
+    if best_count > n:
+        return -1
+    # Dead end: an empty cell has no candidate left
+    if best_count == 0:
+        return 0
+    best_cand = cands[best_cell]
+
+    best_kind = -1
+    best_unit = 0
+    best_bit = 0
+    if best_count > 1:
+        for kind in range(4 if diagonal else 3):
+            for i in range(2 if kind == 3 else n):
+                if kind == 0:
+                    placed = row_mask[i]
+                elif kind == 1:
+                    placed = col_mask[i]
+                elif kind == 2:
+                    placed = box_mask[i]
+                else:
+                    placed = diag_mask[i]
+                missing = ~placed & full
+
+                # Bit-sliced counters: bit v of at_least[k] is set when value v + 1 fits in at
+                # least k cells of the unit. Only counts below the current best matter
+                at_least[0] = full
+                for k in range(1, best_count + 1):
+                    at_least[k] = 0
+                for j in range(n):
+                    cand = cands[_unit_cell_nb(kind, i, j, n, m)]
+                    for k in range(best_count, 0, -1):
+                        at_least[k] |= at_least[k - 1] & cand
+
+                # Dead end: a missing value has no cell left in this unit
+                if missing & ~at_least[1]:
+                    return 0
+                for k in range(1, best_count):
+                    exact = missing & at_least[k] & ~at_least[k + 1]
+                    if exact:
+                        best_kind, best_unit, best_bit, best_count = kind, i, exact & -exact, k
+                        break
+
+    count = 0
+    if best_kind >= 0:
+        for j in range(n):
+            cell = _unit_cell_nb(best_kind, best_unit, j, n, m)
+            if cands[cell] & best_bit:
+                choice_cell[count] = cell
+                choice_bit[count] = best_bit
+                count += 1
+    else:
+        cand = best_cand
+        while cand:
+            bit = cand & -cand
+            cand ^= bit
+            choice_cell[count] = best_cell
+            choice_bit[count] = bit
+            count += 1
+    return count
+
+# Numba-compiled counterpart of backtrack(), filling the flat cells array in place
+# The recursion is replaced by an explicit stack holding, for every search level, its candidate
+# placements and the position of the next one to try
+@njit(cache=True, boundscheck=False)
+def _solve_nb(cells, row_mask, col_mask, box_mask, diag_mask, n, m, diagonal):
+    n_cells = n * n
+    tables = _cell_tables_nb(n, m)
+    cands = np.zeros(n_cells, row_mask.dtype)
+    counts = np.zeros(n_cells, np.int32)
+    at_least = np.zeros(n + 1, np.int64)
+    choice_cell = np.zeros((n_cells + 1, n), np.int64)
+    choice_bit = np.zeros((n_cells + 1, n), np.int64)
+    choice_len = np.zeros(n_cells + 1, np.int64)
+    choice_pos = np.zeros(n_cells + 1, np.int64)
+    depth = 0
+    while True:
+        count = _select_nb(cells, row_mask, col_mask, box_mask, diag_mask, n, m, diagonal, tables,
+                           cands, counts, at_least, choice_cell[depth], choice_bit[depth])
+        if count < 0:
+            return True
+        if count > 0:
+            choice_len[depth] = count
+            choice_pos[depth] = 0
+            depth += 1
+
+        # Undo the last placement and move on to the next one, popping exhausted levels
+        while depth > 0:
+            level = depth - 1
+            pos = choice_pos[level]
+            if pos > 0:
+                _toggle_nb(cells, row_mask, col_mask, box_mask, diag_mask,
+                           choice_cell[level, pos - 1], choice_bit[level, pos - 1], n, m, diagonal)
+            if pos == choice_len[level]:
+                depth -= 1
+                continue
+            _toggle_nb(cells, row_mask, col_mask, box_mask, diag_mask,
+                       choice_cell[level, pos], choice_bit[level, pos], n, m, diagonal)
+            choice_pos[level] = pos + 1
+            break
+        if depth == 0:
+            return False
+
+# Compiled counterpart of build_masks(), filling the given mask arrays
+# Returns the flat index of the first clue that conflicts with an earlier one, or -1 when none does
+@njit(cache=True)
+def _build_masks_nb(cells, row_mask, col_mask, box_mask, diag_mask, n, m, diagonal):
+    for cell in range(n * n):
+        value = cells[cell]
+        if value == 0:
+            continue
+        row = cell // n
+        col = cell % n
+        bit = 1 << (value - 1)
+        box = (row // m) * m + col // m
+        used = row_mask[row] | col_mask[col] | box_mask[box]
+        if diagonal:
+            if row == col:
+                used |= diag_mask[0]
+            if row + col == n - 1:
+                used |= diag_mask[1]
+        if used & bit:
+            return cell
+        row_mask[row] |= bit
+        col_mask[col] |= bit
+        box_mask[box] |= bit
+        if diagonal:
+            if row == col:
+                diag_mask[0] |= bit
+            if row + col == n - 1:
+                diag_mask[1] |= bit
+    return -1
+
+# Compiled counterpart of propagate()
+@njit(cache=True)
+def _propagate_nb(cells, row_mask, col_mask, box_mask, diag_mask, n, m, diagonal):
+    full = (1 << n) - 1
+    changed = True
+    while changed:
+        changed = False
+        for cell in range(n * n):
+            if cells[cell] != 0:
+                continue
+            row = cell // n
+            col = cell % n
+            used = row_mask[row] | col_mask[col] | box_mask[(row // m) * m + col // m]
+            if diagonal:
+                if row == col:
+                    used |= diag_mask[0]
+                if row + col == n - 1:
+                    used |= diag_mask[1]
+            cand = ~used & full
+            if cand == 0:
+                return False
+            if cand & (cand - 1) == 0:
+                _toggle_nb(cells, row_mask, col_mask, box_mask, diag_mask, cell, cand, n, m, diagonal)
+                changed = True
+    return True
+
+# Solves one puzzle given as flat cells (filled in place). masks is a zeroed array of 3n + 2 values of
+# mask_dtype(n) holding the whole search state: the row, column, sub-grid and diagonal masks back to back
+# Returns SOLVED, NO_SOLUTION, or the flat index of a clue that conflicts with an earlier one
+@njit(cache=True)
+def _solve_cells_nb(cells, masks, n, m, diagonal):
+    row_mask = masks[:n]
+    col_mask = masks[n:2 * n]
+    box_mask = masks[2 * n:3 * n]
+    diag_mask = masks[3 * n:]
+    conflict = _build_masks_nb(cells, row_mask, col_mask, box_mask, diag_mask, n, m, diagonal)
+    if conflict >= 0:
+        return conflict
+    if (_propagate_nb(cells, row_mask, col_mask, box_mask, diag_mask, n, m, diagonal)
+            and _solve_nb(cells, row_mask, col_mask, box_mask, diag_mask, n, m, diagonal)):
+        return SOLVED
+    return NO_SOLUTION
+
+# Builds the compiled entry points for n x n puzzles. n and m are closure constants, so that Numba
+# compiles _solve_cells_nb(), and everything it calls, separately for each puzzle size, and LLVM folds
+# them into the index arithmetic and the loop bounds
+def _make_size_solvers(n, m):
+    # Solves one puzzle (see _solve_cells_nb)
+    @njit(cache=True)
+    def solve_cells(cells, masks, diagonal):
+        return _solve_cells_nb(cells, masks, n, m, diagonal)
+
+    # Solves a batch of puzzles in parallel (one puzzle per thread), filling the flat boards[N, n * n]
+    # in place. masks[N, 3n + 2] holds each puzzle's zeroed mask row
+    # status[k] is set to the result of puzzle k
+    @njit(cache=True, parallel=True)
+    def solve_all(boards, diag_flags, masks, status):
+        for k in prange(boards.shape[0]):
+            status[k] = _solve_cells_nb(boards[k], masks[k], n, m, diag_flags[k])
+
+    return solve_cells, solve_all
+
+# Compiled solvers (solve_cells, solve_all) for every supported puzzle size, each compiled on first use
+_size_solvers = {m * m: _make_size_solvers(m * m, m) for m in range(1, isqrt(MAX_SIZE) + 1)}
+
+# Returns the narrowest unsigned type holding the value masks of an n x n puzzle
+# (uint16 up to 16x16, so the whole 9x9 mask state fits in 58 bytes, and uint32 up to MAX_SIZE)
+def mask_dtype(n):
+    return np.uint16 if n <= 16 else np.uint32
+
+# Converts a numeric board back to its printable form (numbers > 9 become letters)
+def format_solution(board):
+    return [[_DISPLAY[value] for value in row] for row in board]
+
+# Returns the PuLP model holding every constraint except the clues, built once per size and variant
+# and cached, since it is identical for all puzzles of the same size
+def get_model_template(n_rows, n_cols, m, diagonal):
+    key = (n_rows, diagonal)
+    if key not in _model_cache:
         # Setup the PuLP problem
         prob, rows, cols, values, grid_vars = setup_problem(n_rows, n_cols)
 
         # Add constraints for a standard Sudoku
-        create_sudoku_constraints(prob, grid_vars, rows, cols, values, n_rows, m, input_sudoku)
+        create_sudoku_constraints(prob, grid_vars, rows, cols, values, n_rows, m)
 
         # Add diagonal constraints if required
         if diagonal:
             add_diagonal_sudoku_constraints(prob, grid_vars, rows, cols, values)
 
+        _model_cache[key] = (prob, rows, cols, values, grid_vars)
+    return _model_cache[key]
+
+# Returns the PuLP solver backend: HiGHS, in-process through highspy or else as a binary, and
+# PuLP's bundled CBC when HiGHS is not installed
+def get_lp_solver():
+    global _lp_solver
+    if _lp_solver is None:
+        for backend in (plp.HiGHS(msg=False), plp.HiGHS_CMD(msg=False)):
+            if backend.available():
+                _lp_solver = backend
+                break
+        else:
+            _lp_solver = plp.PULP_CBC_CMD(msg=False, threads=os.cpu_count())
+    return _lp_solver
+
+# Solves a puzzle by running PuLP's CBC binary directly on the cached model. The model is written
+# in LP format once per size and variant; each puzzle only adds the bounds fixing its clues to
+# that text, instead of PuLP writing the whole model again
+def solve_with_cbc_template(prob, grid_vars, rows, cols, values, key, input_sudoku, cbc):
+    if key not in _lp_text_cache:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            template_path = os.path.join(tmp_dir, "template.lp")
+            prob.writeLP(template_path)
+            with open(template_path) as f:
+                text = f.read()
+        split = text.index("\nBinaries\n") + 1
+        head, tail = text[:split], text[split:]
+        if "\nBounds\n" not in head:
+            head += "Bounds\n"
+        _lp_text_cache[key] = (head, tail)
+    head, tail = _lp_text_cache[key]
+
+    # Fix the clue's variable to 1 and the cell's other values to 0
+    bounds = [f" {var.name} = {fixed_value}\n"
+              for var, fixed_value in prefilled_values(grid_vars, rows, cols, values, input_sudoku)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        lp_path = os.path.join(tmp_dir, "puzzle.lp")
+        sol_path = os.path.join(tmp_dir, "puzzle.sol")
+        with open(lp_path, 'w') as f:
+            f.write(head + "".join(bounds) + tail)
+        threads = cbc.optionsDict.get("threads") or 1
+        subprocess.run([cbc.path, lp_path, "-threads", str(threads), "-solve", "-solu", sol_path],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        with open(sol_path) as f:
+            status_line = f.readline()
+            tokens = f.read().split()
+
+    # Check solution status
+    if not status_line.startswith("Optimal"):
+        raise Exception(f"No optimal solution found. Status: {status_line.split(' - ')[0].strip()}")
+
+    # Solution lines are "index name value reduced_cost"; only the variables set to 1 matter
+    solution = [[0 for _ in cols] for _ in rows]
+    for name, var_value in zip(tokens[1::4], tokens[2::4]):
+        if name.startswith("grid_value_") and float(var_value) > 0.5:
+            row, col, value = map(int, name.rsplit("_", 3)[1:])
+            solution[row][col] = _DISPLAY[value]
+    return solution
+
+# Solves the Sudoku with linear programming (PuLP), kept as a fallback for the native solver
+def solve_with_lp(input_sudoku, diagonal, n_rows, n_cols, m):
+    if plp is None:
+        raise ImportError("PuLP is required for the linear programming solver (pip install pulp).")
+
+    # Fill the naked singles first, so that they are pinned along with the clues
+    row_mask, col_mask, box_mask, diag_mask = build_masks(input_sudoku, n_rows, m, diagonal)
+    if not propagate(input_sudoku, row_mask, col_mask, box_mask, diag_mask, n_rows, m, diagonal):
+        raise Exception("No solution found. The clues are inconsistent.")
+
+    # Take the cached model for this size and fix the puzzle's clues on its variables
+    prob, rows, cols, values, grid_vars = get_model_template(n_rows, n_cols, m, diagonal)
+    lp_solver = get_lp_solver()
+    if isinstance(lp_solver, plp.PULP_CBC_CMD):
+        return solve_with_cbc_template(prob, grid_vars, rows, cols, values, (n_rows, diagonal),
+                                       input_sudoku, lp_solver)
+    fixed = fix_prefilled_values(grid_vars, rows, cols, values, input_sudoku)
+    try:
         # Solve the problem
-        prob.solve()
+        prob.solve(lp_solver)
 
         # Check solution status
         solution_status = plp.LpStatus[prob.status]
-        if solution_status == 'Optimal':
-            solution = extract_solution(grid_vars, rows, cols, values)
-        else:
+        if solution_status != 'Optimal':
             raise Exception(f"No optimal solution found. Status: {solution_status}")
+        return extract_solution(grid_vars, rows, cols, values)
+    finally:
+        # The model is shared by all puzzles of this size
+        release_prefilled_values(fixed)
+
+# Solver for Sudoku, including optional diagonal constraint
+# Uses the native bitmask backtracking solver unless use_lp is set
+def solver(input_sudoku, diagonal=False, use_lp=False):
+    try:
+        # Validate the input Sudoku
+        board, n_rows, n_cols, m = validate_sudoku_input(input_sudoku)
+
+        if use_lp:
+            solution = solve_with_lp(board.tolist(), diagonal, n_rows, n_cols, m)
+        elif HAVE_NUMBA:
+            cells = board.reshape(-1)
+            masks = np.zeros(3 * n_rows + 2, dtype=mask_dtype(n_rows))
+            solve_cells, _ = _size_solvers[n_rows]
+            status = solve_cells(cells, masks, diagonal)
+            if status >= 0:
+                raise clue_conflict_error(cells[status], *divmod(status, n_rows))
+            if status == NO_SOLUTION:
+                raise Exception("No solution found. The clues are inconsistent.")
+            solution = format_solution(board.tolist())
+        else:
+            board = board.tolist()
+            row_mask, col_mask, box_mask, diag_mask = build_masks(board, n_rows, m, diagonal)
+            if not (propagate(board, row_mask, col_mask, box_mask, diag_mask, n_rows, m, diagonal)
+                    and backtrack(board, row_mask, col_mask, box_mask, diag_mask, n_rows, m, diagonal)):
+                raise Exception("No solution found. The clues are inconsistent.")
+            solution = format_solution(board)
 
     except Exception as e:
         print(f"Error: {e}")
@@ -144,46 +822,87 @@ def solver(input_sudoku, diagonal=False):
 
     return solution
 
+# Solves a list of puzzles with the compiled solver, batching the puzzles of each size together
+def solve_batch(sudokus, diagonal_flags):
+    solutions = [None] * len(sudokus)
+    batches = {}
+    for index, sudoku in enumerate(sudokus):
+        try:
+            board, n_rows, n_cols, m = validate_sudoku_input(sudoku)
+        except Exception as e:
+            print(f"Error: {e}")
+            continue
+        batches.setdefault(n_rows, []).append((index, board))
+
+    for n, batch in batches.items():
+        indices = [index for index, _ in batch]
+        boards = np.stack([board.reshape(-1) for _, board in batch])
+        diag_flags = np.array([diagonal_flags[index] for index in indices], dtype=np.bool_)
+        masks = np.zeros((len(indices), 3 * n + 2), dtype=mask_dtype(n))
+        status = np.zeros(len(indices), dtype=np.int64)
+        _, solve_all = _size_solvers[n]
+        solve_all(boards, diag_flags, masks, status)
+        for k, index in enumerate(indices):
+            if status[k] == SOLVED:
+                solutions[index] = format_solution(boards[k].reshape(n, n).tolist())
+            elif status[k] == NO_SOLUTION:
+                print("Error: No solution found. The clues are inconsistent.")
+            else:
+                print(f"Error: {clue_conflict_error(boards[k, status[k]], *divmod(status[k], n))}")
+    return solutions
+
 # Reads Sudoku puzzles from an input file, validates them, and returns them
 def read_sudokus_from_file(filename):
     sudokus = []
     diagonal_flags = []
 
     try:
+        # Read the whole file at once and frame it into puzzles on the blank lines between them
         with open(filename, 'r') as f:
-            num_sudokus = int(f.readline().strip())
-            for sudoku_index in range(num_sudokus):
+            count_line, _, content = f.read().lstrip().partition('\n')
+        num_sudokus = int(count_line)
+        blocks = _BLOCK_SEPARATOR.split(content.strip())
+        for sudoku_index in range(num_sudokus):
+            try:
+                if sudoku_index >= len(blocks) or not blocks[sudoku_index]:
+                    raise ValueError(f"Sudoku {sudoku_index + 1}: Unexpected end of file.")
+                header, *lines = blocks[sudoku_index].splitlines()
+                dim, diagonal_flag = map(int, header.split())
+                diagonal = diagonal_flag == 1
+
+                # Validate if the dimension is a perfect square
+                m = isqrt(dim)
+                if m * m != dim:
+                    raise ValueError(f"Sudoku {sudoku_index + 1}: Invalid dimension {dim}. Must be a perfect square.")
+                if dim > MAX_SIZE:
+                    raise ValueError(f"Sudoku {sudoku_index + 1}: Invalid dimension {dim}. Must be at most {MAX_SIZE}.")
+
+                if len(lines) != dim:
+                    raise ValueError(f"Sudoku {sudoku_index + 1}: Expected {dim} rows, found {len(lines)}.")
+                cells = []
+                for row_index, line in enumerate(lines):
+                    row = line.split()
+                    if len(row) != dim:
+                        raise ValueError(f"Sudoku {sudoku_index + 1}: Row {row_index + 1} has invalid length.")
+                    cells.extend(row)
+
+                n_cells = dim * dim
                 try:
-                    dim, diagonal_flag = map(int, f.readline().strip().split())
-                    diagonal = diagonal_flag == 1
-
-                    # Validate if the dimension is a perfect square
-                    m = int(sqrt(dim))
-                    if m * m != dim:
-                        raise ValueError(f"Sudoku {sudoku_index + 1}: Invalid dimension {dim}. Must be a perfect square.")
-
-                    sudoku = []
-                    for row_index in range(dim):
-                        row = f.readline().strip().split()
-
-                        if len(row) != dim:
-                            raise ValueError(f"Sudoku {sudoku_index + 1}: Row {row_index + 1} has invalid length.")
-
-                        numeric_row = [convert_to_numeric(value) for value in row]
-                        for col_index, value in enumerate(numeric_row):
-                            if not (0 <= value <= dim):
-                                raise ValueError(f"Sudoku {sudoku_index + 1}: Invalid value '{value}' at position ({row_index + 1}, {col_index + 1}).")
-
-                        sudoku.append(numeric_row)
-
-                    sudokus.append(sudoku)
-                    diagonal_flags.append(diagonal)
-
-                    f.readline()
-
-                except ValueError as e:
-                    print(f"Error reading Sudoku {sudoku_index + 1}: {e}")
-                    continue
+                    sudoku = np.fromiter(map(_NUM_LUT.__getitem__, cells), dtype=np.int8, count=n_cells).reshape(dim, dim)
+                except KeyError as e:
+                    raise ValueError(f"Sudoku {sudoku_index + 1}: Invalid value '{e.args[0]}'.") from None
+                invalid = sudoku > dim
+                if invalid.any():
+                    row_index, col_index = np.argwhere(invalid)[0]
+                    raise ValueError(f"Sudoku {sudoku_index + 1}: Invalid value '{cells[row_index * dim + col_index]}' "
+                                     f"at position ({row_index + 1}, {col_index + 1}).")
+
+                sudokus.append(sudoku)
+                diagonal_flags.append(diagonal)
+
+            except ValueError as e:
+                print(f"Error reading Sudoku {sudoku_index + 1}: {e}")
+                continue
 
     except FileNotFoundError:
         print(f"Error: File '{filename}' not found.")
@@ -207,11 +926,11 @@ def write_sudoku_solutions_to_file(solutions, filename):
 # Main function to read Sudoku puzzles, solve them, and write the solutions
 def main(input_file, output_file):
     sudokus, diagonal_flags = read_sudokus_from_file(input_file)
-    solutions = []
 
-    for sudoku, diagonal in zip(sudokus, diagonal_flags):
-        solution = solver(sudoku, diagonal)
-        solutions.append(solution)
+    if HAVE_NUMBA:
+        solutions = solve_batch(sudokus, diagonal_flags)
+    else:
+        solutions = [solver(sudoku, diagonal) for sudoku, diagonal in zip(sudokus, diagonal_flags)]
 
     write_sudoku_solutions_to_file(solutions, output_file)
 